@@ -1,9 +1,27 @@
+import os
+
 import uvicorn
 
 
+def _worker_count() -> int:
+    # in-memory sessions are per-process, so multiple workers would shard
+    # session state; only scale out when Redis holds the sessions
+    if os.environ.get("SESSION_REDIS_URL"):
+        return os.cpu_count() or 1
+    return 1
+
+
 def main() -> None:
-    # spins up the fastapi server
-    uvicorn.run("src.api.routes:app", host="0.0.0.0", port=8000, reload=False)
+    # spins up the fastapi server on uvloop + httptools
+    uvicorn.run(
+        "src.api.routes:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=_worker_count(),
+        reload=False,
+    )
 
 
 if __name__ == "__main__":
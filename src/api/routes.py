@@ -2,19 +2,39 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from src.api.session import (
+    RedisSessionStore,
     SessionStore,
     apply_command,
+    create_session_store,
     identify_command,
 )
 
-app = FastAPI(title="Controlled RAG", version="0.1.0")
-sessions = SessionStore()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.sessions = create_session_store()
+    try:
+        yield
+    finally:
+        await app.state.sessions.aclose()
+
+
+app = FastAPI(
+    title="Controlled RAG",
+    version="0.1.0",
+    lifespan=lifespan,
+)
+
+
+def get_sessions(request: Request) -> Union[SessionStore, RedisSessionStore]:
+    return request.app.state.sessions
 
 
 class ChatRequest(BaseModel):
@@ -28,7 +48,10 @@ class ChatResponse(BaseModel):
 
 
 @app.post("/v1/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest) -> ChatResponse:
+async def chat(
+    payload: ChatRequest,
+    sessions: Union[SessionStore, RedisSessionStore] = Depends(get_sessions),
+) -> ChatResponse:
     raw_message = payload.message.strip()
     if not raw_message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
@@ -36,7 +59,9 @@ def chat(payload: ChatRequest) -> ChatResponse:
     command = identify_command(raw_message)
     if command:
         try:
-            response_text = apply_command(sessions, payload.session_id, command)
+            response_text = await apply_command(
+                sessions, payload.session_id, command
+            )
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
         return ChatResponse(
@@ -44,13 +69,13 @@ def chat(payload: ChatRequest) -> ChatResponse:
             response=response_text,
         )
 
-    state = sessions.get(payload.session_id)
-    state.append("user", raw_message)
+    state = await sessions.get(payload.session_id)
+    await state.append("user", raw_message)
 
     # Static response placeholder
     answer = "Logic cleaned. Backend is ready for new implementation."
 
-    state.append("assistant", answer)
+    await state.append("assistant", answer)
     return ChatResponse(
         session_id=payload.session_id,
         response=answer,
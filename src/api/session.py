@@ -2,71 +2,176 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from threading import RLock
-from typing import Dict, List, Optional
+from threading import RLock, local
+from typing import Deque, Dict, List, Optional, Union
+import os
 import re
 
+import orjson
+
 COMMAND_CLEAR = "clear"
 
+_SESSION_TTL_SECONDS = 86400
+_HISTORY_MAX_MESSAGES = 200
+
 _COMMAND_PATTERN = re.compile(r"^/(\w+)")
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatMessage:
     role: str
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionState:
     session_id: str
-    history: List[ChatMessage] = field(default_factory=list)
+    history: Deque[ChatMessage] = field(
+        default_factory=lambda: deque(maxlen=_HISTORY_MAX_MESSAGES)
+    )
 
-    def append(self, role: str, content: str) -> None:
+    async def append(self, role: str, content: str) -> None:
         self.history.append(ChatMessage(role=role, content=content))
 
 
 class SessionStore:
-    """In-memory session registry with minimal locking."""
+    """In-memory session registry with minimal locking.
+
+    ``get`` keeps a per-thread cache of the last session it served, so
+    repeated messages handled by the same thread skip the lock entirely.
+    ``clear`` bumps a store-wide generation counter; cached entries from
+    older generations are discarded, so no thread can keep appending to a
+    ``SessionState`` that was replaced by another thread.
+    """
 
     def __init__(self) -> None:
         self._sessions: Dict[str, SessionState] = {}
         self._lock = RLock()
-
-    def get(self, session_id: str) -> SessionState:
+        self._tls = local()
+        self._generation = 0
+
+    async def get(self, session_id: str) -> SessionState:
+        last = getattr(self._tls, "last", None)
+        if (
+            last is not None
+            and last[0] == session_id
+            and last[2] == self._generation
+        ):
+            return last[1]
         with self._lock:
-            return self._sessions.setdefault(
+            state = self._sessions.setdefault(
                 session_id, SessionState(session_id=session_id)
             )
+            generation = self._generation
+        self._tls.last = (session_id, state, generation)
+        return state
 
-    def clear(self, session_id: str) -> SessionState:
+    async def clear(self, session_id: str) -> SessionState:
         with self._lock:
+            self._generation += 1
             state = SessionState(session_id=session_id)
             self._sessions[session_id] = state
-            return state
+            generation = self._generation
+        self._tls.last = (session_id, state, generation)
+        return state
+
+    async def aclose(self) -> None:
+        """Nothing to release for the in-memory backend."""
+
+
+class RedisSessionState:
+    """Session view backed by a Redis list, mirroring ``SessionState``.
+
+    Unlike ``SessionState.history``, ``history()`` is a coroutine because it
+    round-trips to Redis.
+    """
+
+    def __init__(self, client: "redis.asyncio.Redis", session_id: str) -> None:
+        self._client = client
+        self.session_id = session_id
+        self._key = f"sess:{session_id}:history"
+
+    async def history(self) -> List[ChatMessage]:
+        raw = await self._client.lrange(self._key, 0, -1)
+        return [ChatMessage(**orjson.loads(item)) for item in raw]
+
+    async def append(self, role: str, content: str) -> None:
+        payload = orjson.dumps({"role": role, "content": content})
+        pipe = self._client.pipeline()
+        pipe.rpush(self._key, payload)
+        pipe.ltrim(self._key, -_HISTORY_MAX_MESSAGES, -1)
+        pipe.expire(self._key, _SESSION_TTL_SECONDS)
+        await pipe.execute()
+
+
+class RedisSessionStore:
+    """Redis-backed session registry for multi-worker deployments.
+
+    Histories live as Redis lists keyed ``sess:{session_id}:history`` with a
+    TTL, so any uvicorn worker (or container) can serve any session. All
+    commands run on ``redis.asyncio`` so the event loop is never blocked;
+    the connection pool is created once, at store construction.
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "RedisSessionStore requires the 'redis' package; "
+                "install with: pip install '.[redis]'"
+            ) from exc
+        self._client = redis.asyncio.Redis.from_url(url)
+
+    async def get(self, session_id: str) -> RedisSessionState:
+        return RedisSessionState(self._client, session_id)
+
+    async def clear(self, session_id: str) -> RedisSessionState:
+        await self._client.delete(f"sess:{session_id}:history")
+        return RedisSessionState(self._client, session_id)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_session_store() -> Union[SessionStore, RedisSessionStore]:
+    """Build the session store, using Redis when SESSION_REDIS_URL is set."""
+
+    url = os.environ.get("SESSION_REDIS_URL")
+    if url:
+        return RedisSessionStore(url)
+    return SessionStore()
 
 
 def identify_command(message: str) -> Optional[str]:
-    match = _COMMAND_PATTERN.match(message.strip())
+    """Return the slash-command name, if any. Expects a pre-stripped message."""
+
+    match = _COMMAND_PATTERN.match(message)
     if not match:
         return None
     return match.group(1).lower()
 
 
-def apply_command(store: SessionStore, session_id: str, command: str) -> str:
+async def apply_command(
+    store: Union[SessionStore, RedisSessionStore], session_id: str, command: str
+) -> str:
     """Execute a recognized slash command."""
 
     if command == COMMAND_CLEAR:
-        store.clear(session_id)
+        await store.clear(session_id)
         return "Session cleared."
     raise ValueError(f"Unsupported command: /{command}")
 
 
 __all__ = [
     "ChatMessage",
+    "RedisSessionState",
+    "RedisSessionStore",
     "SessionState",
     "SessionStore",
     "apply_command",
+    "create_session_store",
     "identify_command",
 ]